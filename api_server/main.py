@@ -1,7 +1,11 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-import tempfile
+import asyncio
+from contextlib import asynccontextmanager
+import logging
+import logging.handlers
 import os
+import queue
 import sys
 import json
 from pathlib import Path
@@ -10,11 +14,94 @@ from pathlib import Path
 meta_path = Path(__file__).parent.parent / "meta"
 sys.path.append(str(meta_path))
 
-from assistant import get_reply
-from mic_to_text import transcribe_audio
+from assistant import astream_reply, async_warm_up as warm_up_assistant
+from mic_to_text import transcribe_audio, warm_up as warm_up_whisper, NUM_WORKERS as WHISPER_WORKERS
 from profile_manager import profile_manager
 
-app = FastAPI(title="RizzBot API", description="AI-powered rizz generator for dates")
+# Log through a queue so request handlers never block on stdout
+log_queue = queue.SimpleQueue()
+log_handler = logging.StreamHandler()
+log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+log_listener = logging.handlers.QueueListener(log_queue, log_handler)
+log_listener.start()
+
+logger = logging.getLogger("rizz")
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+logger.addHandler(logging.handlers.QueueHandler(log_queue))
+logger.propagate = False
+
+# File the glasses client watches for text to speak
+RIZZ_FILE = meta_path / "rizz_to_speak.txt"
+SENTENCE_ENDINGS = ('.', '!', '?')
+AUDIO_SUFFIXES = frozenset({'.wav', '.mp3', '.m4a', '.aac', '.m4v', '.mov'})
+# Non-word fillers and Whisper's known silence hallucinations; not worth an LLM call.
+# Short real replies ("thank you", "bye", "oh") are left for the assistant to answer
+FILLER_TRANSCRIPTS = frozenset({
+    '', 'uh', 'um', 'uhm', 'hmm', 'hm', 'mm', 'mhm',
+    'thanks for watching', 'thank you for watching'
+})
+
+def is_filler_transcript(transcript):
+    """True if the transcript has no words or is only a filler sound"""
+    normalized = " ".join(transcript.lower().replace(',', ' ').replace('.', ' ').replace('!', ' ').replace('?', ' ').split())
+    return normalized in FILLER_TRANSCRIPTS
+
+def append_to_rizz_file(text, first=False):
+    # Append per sentence so the glasses can start speaking before generation finishes;
+    # the first sentence truncates, so replies left unspoken by an earlier request are dropped
+    try:
+        with open(RIZZ_FILE, 'w' if first else 'a', buffering=1) as f:
+            f.write(text + "\n")
+        logger.info("🎤 Triggered glasses to speak: %s", text)
+    except Exception as speak_error:
+        logger.warning("Could not trigger glasses speech: %s", speak_error)
+
+async def stream_rizz_to_glasses(transcript):
+    """Stream the reply into the glasses trigger file a sentence at a time and return the full reply"""
+    chunks = []
+    pending = ""
+    write_task = None
+    
+    async def flush(text, previous):
+        # Chain writes so sentences land in order while the LLM keeps streaming
+        if previous:
+            await previous
+        await asyncio.to_thread(append_to_rizz_file, text.strip(), previous is None)
+    
+    async for delta in astream_reply(transcript):
+        chunks.append(delta)
+        pending += delta
+        if pending.rstrip().endswith(SENTENCE_ENDINGS):
+            write_task = asyncio.create_task(flush(pending, write_task))
+            pending = ""
+    
+    if pending.strip():
+        write_task = asyncio.create_task(flush(pending, write_task))
+    if write_task:
+        await write_task
+    
+    return "".join(chunks).strip()
+
+# Requests beyond the model's worker count wait here instead of piling up threads
+whisper_slots = asyncio.Semaphore(WHISPER_WORKERS)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load Whisper, the OpenAI connection pool and Ava's profile before the first request"""
+    # Runs in each worker process, so the supervisor never loads a model
+    logger.info("🔥 Warming up Whisper and OpenAI...")
+    await asyncio.gather(
+        asyncio.to_thread(warm_up_whisper),
+        warm_up_assistant()
+    )
+    logger.info("✅ Warm-up complete")
+    
+    yield
+    
+    # Drain any queued log records before exit
+    log_listener.stop()
+
+app = FastAPI(title="RizzBot API", description="AI-powered rizz generator for dates", lifespan=lifespan)
 
 # Add CORS middleware for Expo app
 app.add_middleware(
@@ -40,75 +127,56 @@ async def get_rizz_response(audio_file: UploadFile = File(...)):
     """
     try:
         # Log the incoming file details for debugging
-        print(f"🎤 Received audio file: {audio_file.filename} ({audio_file.content_type})")
+        logger.info("🎤 Received audio file: %s (%s)", audio_file.filename, audio_file.content_type)
         
         # Validate file type - be more permissive for Expo audio files
         filename = audio_file.filename.lower() if audio_file.filename else ""
         content_type = audio_file.content_type.lower() if audio_file.content_type else ""
         
         # Accept any file that looks like audio or has no extension (Expo might not set filename properly)
+        # (Expo's default 'recording.wav' is covered by the suffix check)
         is_audio = (
-            filename.endswith(('.wav', '.mp3', '.m4a', '.aac', '.m4v', '.mov')) or
-            content_type.startswith('audio/') or
-            'audio' in content_type or
             not filename or  # Accept files without extension
-            filename == 'recording.wav'  # Accept Expo's default filename
+            os.path.splitext(filename)[1] in AUDIO_SUFFIXES or
+            'audio' in content_type
         )
         
         if not is_audio:
-            print(f"❌ Rejected file: {filename} ({content_type})")
+            logger.info("❌ Rejected file: %s (%s)", filename, content_type)
             raise HTTPException(status_code=400, detail=f"Only audio files are supported. Got: {filename} ({content_type})")
         
-        print(f"✅ Accepted audio file: {filename} ({content_type})")
+        logger.info("✅ Accepted audio file: %s (%s)", filename, content_type)
         
-        # Save uploaded audio to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-            content = await audio_file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
+        # Whisper decodes the spooled upload directly, no temp file round-trip
+        audio_file.file.seek(0)
+        logger.info("🎧 Transcribing audio file: %s", filename)
+        # Transcribe the audio in a worker thread so other requests keep flowing
+        async with whisper_slots:
+            transcript = await asyncio.to_thread(transcribe_audio, audio_file.file)
+        logger.info("📝 Transcript: %s", transcript)
         
-        try:
-            print(f"🎧 Transcribing audio file: {temp_file_path}")
-            # Transcribe the audio
-            transcript = transcribe_audio(temp_file_path)
-            print(f"📝 Transcript: {transcript}")
-            
-            if not transcript or transcript.strip() == "":
-                print("❌ No speech detected in audio")
-                return {
-                    "success": False,
-                    "message": "No speech detected in audio",
-                    "rizz": "I didn't catch that. Could you repeat?"
-                }
-            
-            print(f"🤖 Generating rizz for: {transcript}")
-            # Get rizz response using existing logic
-            rizz_response = get_reply(transcript)
-            print(f"🎯 Rizz generated: {rizz_response}")
-            
-            # Trigger glasses to speak the rizz
-            try:
-                rizz_file = Path(__file__).parent.parent / "meta" / "rizz_to_speak.txt"
-                with open(rizz_file, 'w') as f:
-                    f.write(rizz_response)
-                print(f"🎤 Triggered glasses to speak: {rizz_response}")
-            except Exception as speak_error:
-                print(f"Warning: Could not trigger glasses speech: {speak_error}")
-            
+        if not transcript or is_filler_transcript(transcript):
+            logger.info("❌ No speech detected in audio")
             return {
-                "success": True,
-                "transcript": transcript,
-                "rizz": rizz_response,
-                "message": "Rizz generated successfully!"
+                "success": False,
+                "message": "No speech detected in audio",
+                "rizz": "I didn't catch that. Could you repeat?"
             }
-            
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
+        
+        logger.info("🤖 Generating rizz for: %s", transcript)
+        # Stream the rizz to the glasses as it is generated
+        rizz_response = await stream_rizz_to_glasses(transcript)
+        logger.info("🎯 Rizz generated: %s", rizz_response)
+        
+        return {
+            "success": True,
+            "transcript": transcript,
+            "rizz": rizz_response,
+            "message": "Rizz generated successfully!"
+        }
                 
     except Exception as e:
-        print(f"Error processing rizz request: {e}")
+        logger.error("Error processing rizz request: %s", e)
         raise HTTPException(status_code=500, detail=f"Error processing audio: {str(e)}")
 
 @app.get("/profiles")
@@ -116,7 +184,7 @@ async def get_profiles():
     """Get Ava's profile info (always)"""
     try:
         # Always get Ava's profile info
-        profile_info = profile_manager.load_profile('416')  # Ava's contact ID
+        profile_info = profile_manager.get_cached('416')  # Ava's contact ID
         
         if profile_info:
             return {
@@ -135,9 +203,19 @@ async def get_profiles():
             }
             
     except Exception as e:
-        print(f"Error getting Ava's profile: {e}")
+        logger.error("Error getting Ava's profile: %s", e)
         raise HTTPException(status_code=500, detail=f"Error getting Ava's profile: {str(e)}")
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    # Each worker process loads its own Whisper model, so scale workers with memory in mind
+    workers = int(os.getenv("API_WORKERS", "1"))
+    uvicorn.run(
+        "main:app",
+        app_dir=str(Path(__file__).parent),
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+        loop="uvloop",
+        http="httptools"
+    ) 
\ No newline at end of file
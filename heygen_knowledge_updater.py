@@ -5,13 +5,24 @@ Updates HeyGen knowledge base with conversation context from Supabase
 """
 
 import asyncio
+import hashlib
 import httpx
+import io
 import json
 import logging
 import os
+import sys
+from collections import deque
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
+try:
+    from supabase import acreate_client
+except ImportError:
+    # Realtime watching is optional, polling still works without it
+    acreate_client = None
+
 try:
     from dotenv import load_dotenv
     load_dotenv()
@@ -23,6 +34,23 @@ except ImportError:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Where the per-contact message tails are kept between runs
+CONTEXT_STATE_FILE = os.getenv("HEYGEN_CONTEXT_STATE_FILE", "heygen_context_state.json")
+MESSAGES_PER_CONTACT = 20
+# Request body up to the prompt string; the prompt itself is spliced on per update
+KNOWLEDGE_BODY_HEAD = '{"name": "Rizz GPT", "opening": "hey wassup girl", "prompt": '
+# Seconds of quiet after a new message before pushing to HeyGen
+WATCH_DEBOUNCE_SECONDS = 5.0
+HEYGEN_API_URL = "https://api.heygen.com"
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create a pooled HTTP/2 client for Supabase and HeyGen requests"""
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=30.0,
+        limits=httpx.Limits(max_keepalive_connections=10, max_connections=20)
+    )
+
 class HeyGenKnowledgeUpdater:
     """Updates HeyGen knowledge base with conversation context"""
     
@@ -30,21 +58,83 @@ class HeyGenKnowledgeUpdater:
                  heygen_api_key: str,
                  supabase_url: str, 
                  supabase_service_key: str,
-                 knowledge_base_id: str = "7539c5f570384a9c819eac8b19503b34"):
+                 knowledge_base_id: str = "7539c5f570384a9c819eac8b19503b34",
+                 state_file: str = CONTEXT_STATE_FILE,
+                 client: Optional[httpx.AsyncClient] = None):
         self.heygen_api_key = heygen_api_key
         self.supabase_url = supabase_url
         self.supabase_service_key = supabase_service_key
         self.knowledge_base_id = knowledge_base_id
-        self.client = httpx.AsyncClient(timeout=30.0)
+        # Reuse a caller-provided client when given so TLS sessions outlive this updater
+        self._owns_client = client is None
+        self.client = client or create_http_client()
+        
+        # Rolling per-contact history so each update only fetches new messages
+        self.state_file = state_file
+        self.contact_messages: Dict[str, Dict[str, Any]] = {}
+        self.last_timestamp: Optional[str] = None
+        # SHA-256 of the last body HeyGen accepted, to skip identical uploads
+        self.last_knowledge_digest: Optional[str] = None
+        self._load_context_state()
     
     async def __aenter__(self):
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.client.aclose()
+        if self._owns_client:
+            await self.client.aclose()
+    
+    async def warm_up(self):
+        """Open the Supabase and HeyGen connections (TCP + TLS) ahead of the first update"""
+        results = await asyncio.gather(
+            self.client.head(self.supabase_url),
+            self.client.head(HEYGEN_API_URL),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Connection warm-up failed: {str(result)}")
+    
+    def _load_context_state(self):
+        """Restore the per-contact message tails and last-seen timestamp from disk"""
+        try:
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Could not read conversation state, starting fresh: {str(e)}")
+            return
+        
+        self.last_timestamp = state.get('last_timestamp')
+        self.last_knowledge_digest = state.get('knowledge_digest')
+        for contact_id, contact_data in state.get('contacts', {}).items():
+            self.contact_messages[contact_id] = {
+                'name': contact_data.get('name', 'Unknown'),
+                'messages': deque(contact_data.get('messages', []), maxlen=MESSAGES_PER_CONTACT)
+            }
+    
+    def _save_context_state(self):
+        """Persist the per-contact message tails and last-seen timestamp"""
+        state = {
+            'last_timestamp': self.last_timestamp,
+            'knowledge_digest': self.last_knowledge_digest,
+            'contacts': {
+                contact_id: {
+                    'name': contact_data['name'],
+                    'messages': list(contact_data['messages'])
+                }
+                for contact_id, contact_data in self.contact_messages.items()
+            }
+        }
+        try:
+            with open(self.state_file, 'w') as f:
+                json.dump(state, f)
+        except Exception as e:
+            logger.warning(f"Could not save conversation state: {str(e)}")
     
-    async def get_all_messages_from_supabase(self) -> List[Dict[str, Any]]:
-        """Fetch all messages from Supabase using REST API"""
+    async def get_all_messages_from_supabase(self, since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Fetch messages from Supabase using REST API, only those newer than `since` if given"""
         try:
             headers = {
                 "Authorization": f"Bearer {self.supabase_service_key}",
@@ -59,6 +149,8 @@ class HeyGenKnowledgeUpdater:
                 "order": "timestamp.asc",
                 "limit": 1000  # Adjust based on your needs
             }
+            if since:
+                params["timestamp"] = f"gt.{since}"
             
             response = await self.client.get(url, headers=headers, params=params)
             response.raise_for_status()
@@ -71,55 +163,87 @@ class HeyGenKnowledgeUpdater:
             logger.error(f"Error fetching messages from Supabase: {str(e)}")
             return []
     
-    def format_conversation_context(self, messages: List[Dict[str, Any]]) -> str:
-        """Format messages into a readable conversation context"""
-        if not messages:
-            return "No previous conversation history available."
-        
-        context_lines = []
-        context_lines.append("=== PREVIOUS CONVERSATION HISTORY ===")
-        context_lines.append("This is context from previous conversations. Reference this information to maintain consistency and build on past interactions.\n")
-        
-        # Group messages by contact for better organization
-        contacts_messages = {}
-        for msg in messages:
-            contact_name = "Unknown"
-            contact_id = msg.get('contact_id', 'unknown')
+    async def refresh_contact_name(self, contact_id: str):
+        """Look up a contact's name for messages that arrived without the contacts join"""
+        try:
+            headers = {
+                "Authorization": f"Bearer {self.supabase_service_key}",
+                "Content-Type": "application/json",
+                "apikey": self.supabase_service_key
+            }
+            
+            url = f"{self.supabase_url}/rest/v1/contacts"
+            params = {"select": "name, whatsapp_id", "id": f"eq.{contact_id}"}
+            
+            response = await self.client.get(url, headers=headers, params=params)
+            response.raise_for_status()
             
-            if msg.get('contacts'):
-                contact_name = msg['contacts'].get('name') or msg['contacts'].get('whatsapp_id', 'Unknown')
+            rows = response.json()
+            contact_data = self.contact_messages.get(contact_id)
+            if rows and contact_data:
+                contact_data['name'] = rows[0].get('name') or rows[0].get('whatsapp_id') or 'Unknown'
+                
+        except Exception as e:
+            logger.warning(f"Could not look up name for contact {contact_id}: {str(e)}")
+    
+    def add_messages(self, messages: List[Dict[str, Any]]):
+        """Fold new messages into the per-contact tails of the last few messages"""
+        for msg in messages:
+            contact_id = str(msg.get('contact_id', 'unknown'))  # JSON state keys are strings
+            contact_data = self.contact_messages.get(contact_id)
             
-            if contact_id not in contacts_messages:
-                contacts_messages[contact_id] = {
-                    'name': contact_name,
-                    'messages': []
+            if contact_data is None:
+                contact_data = self.contact_messages[contact_id] = {
+                    'name': "Unknown",
+                    'messages': deque(maxlen=MESSAGES_PER_CONTACT)
                 }
             
-            contacts_messages[contact_id]['messages'].append(msg)
+            # Realtime records carry no contacts join, so fill in a missing name whenever one arrives
+            if contact_data['name'] == "Unknown" and msg.get('contacts'):
+                contact_data['name'] = msg['contacts'].get('name') or msg['contacts'].get('whatsapp_id', 'Unknown')
+            
+            # Keep only the fields the context needs
+            contact_data['messages'].append({
+                'timestamp': msg.get('timestamp') or '',
+                'is_inbound': msg.get('is_inbound'),
+                'text_content': msg.get('text_content') or ''
+            })
+            
+            if msg.get('timestamp'):
+                self.last_timestamp = msg['timestamp']
+    
+    def format_conversation_context(self, messages: List[Dict[str, Any]]) -> str:
+        """Add new messages and format the per-contact history into a readable conversation context"""
+        self.add_messages(messages)
+        
+        if not self.contact_messages:
+            return "No previous conversation history available."
+        
+        context = io.StringIO()
+        context.write("=== PREVIOUS CONVERSATION HISTORY ===\n")
+        context.write("This is context from previous conversations. Reference this information to maintain consistency and build on past interactions.\n\n")
         
         # Format conversations
-        for contact_id, contact_data in contacts_messages.items():
-            contact_name = contact_data['name']
-            messages_list = contact_data['messages']
-            
-            context_lines.append(f"\n--- Conversation with {contact_name} ---")
+        for contact_data in self.contact_messages.values():
+            context.write(f"\n--- Conversation with {contact_data['name']} ---\n")
             
-            for msg in messages_list[-20:]:  # Last 20 messages per contact
-                timestamp = msg.get('timestamp', '')[:19]  # Remove timezone info for readability
-                direction = "THEM" if msg.get('is_inbound') else "YOU"
-                content = msg.get('text_content', '').strip()
+            for msg in contact_data['messages']:  # Last 20 messages per contact
+                timestamp = msg['timestamp'][:19]  # Remove timezone info for readability
+                direction = "THEM" if msg['is_inbound'] else "YOU"
+                content = msg['text_content'].strip()
                 
                 if content:  # Only include messages with text content
-                    context_lines.append(f"[{timestamp}] {direction}: {content}")
+                    context.write(f"[{timestamp}] {direction}: {content}\n")
         
-        context_lines.append("\n=== END CONVERSATION HISTORY ===\n")
-        return "\n".join(context_lines)
+        context.write("\n=== END CONVERSATION HISTORY ===\n")
+        return context.getvalue()
     
-    async def update_heygen_knowledge_base(self, conversation_context: str) -> bool:
-        """Update HeyGen knowledge base with new context"""
-        try:
-            # Base personality prompt as specified
-            base_prompt = os.getenv("BASE_PROMPT") + """
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _knowledge_body_prefix() -> bytes:
+        """JSON-encode the request body up to the conversation context, once per process"""
+        # Base personality prompt as specified
+        base_prompt = os.getenv("BASE_PROMPT") + """
 
 
 ## Specific Slang Terms
@@ -3990,12 +4114,22 @@ is that 5 of you in your photo"
 1,surely you must have a favourite *air guitar*
 
 """
-            
-            # Combine with conversation context
-            full_knowledge = f"{base_prompt}\n\n{conversation_context}"
+        
+        # Keep the opening quote of the prompt string; the context closes it
+        return (KNOWLEDGE_BODY_HEAD + json.dumps(f"{base_prompt}\n\n")[:-1]).encode()
+    
+    async def update_heygen_knowledge_base(self, conversation_context: str) -> bool:
+        """Update HeyGen knowledge base with new context, skipping the upload if nothing changed"""
+        try:
+            # Splice the escaped context onto the pre-encoded base prompt
+            body = self._knowledge_body_prefix() + json.dumps(conversation_context)[1:].encode() + b"}"
+            digest = hashlib.sha256(body).hexdigest()
+            if digest == self.last_knowledge_digest:
+                logger.info("Knowledge base already up to date - skipping upload")
+                return True
             
             # HeyGen API endpoint for updating knowledge base
-            url = f"https://api.heygen.com/v1/streaming/knowledge_base/{self.knowledge_base_id}"
+            url = f"{HEYGEN_API_URL}/v1/streaming/knowledge_base/{self.knowledge_base_id}"
             
             headers = {
                 "x-api-key": self.heygen_api_key,
@@ -4003,16 +4137,11 @@ is that 5 of you in your photo"
                 "accept": "application/json"
             }
             
-            payload = {
-                "name": "Rizz GPT",
-                "opening": "hey wassup girl",
-                "prompt": full_knowledge
-            }
-            
-            response = await self.client.post(url, headers=headers, json=payload)
+            response = await self.client.post(url, headers=headers, content=body)
             
             if response.status_code == 200:
                 logger.info("Successfully updated HeyGen knowledge base")
+                self.last_knowledge_digest = digest
                 return True
             else:
                 logger.error(f"HeyGen API error: {response.status_code} - {response.text}")
@@ -4026,13 +4155,14 @@ is that 5 of you in your photo"
         """Main method to update knowledge base with full conversation context"""
         try:
             logger.info("Fetching conversation history from Supabase...")
-            messages = await self.get_all_messages_from_supabase()
+            messages = await self.get_all_messages_from_supabase(since=self.last_timestamp)
             
             logger.info("Formatting conversation context...")
             conversation_context = self.format_conversation_context(messages)
             
             logger.info("Updating HeyGen knowledge base...")
             success = await self.update_heygen_knowledge_base(conversation_context)
+            self._save_context_state()
             
             if success:
                 logger.info("✅ Knowledge base updated successfully with conversation history")
@@ -4045,20 +4175,79 @@ is that 5 of you in your photo"
             logger.error(f"Error in knowledge update process: {str(e)}")
             return False
 
+    async def watch_conversation_history(self, debounce_seconds: float = WATCH_DEBOUNCE_SECONDS):
+        """Keep the knowledge base current from Supabase Realtime inserts instead of re-polling"""
+        if acreate_client is None:
+            logger.error("supabase package not installed - install it to watch for new messages")
+            return
+        
+        # Catch up on anything missed while we weren't watching
+        await self.update_knowledge_with_conversation_history()
+        
+        pending_update: Optional[asyncio.Task] = None
+        # Name lookups for contacts first seen through Realtime, keyed by contact ID
+        name_lookups: Dict[str, asyncio.Task] = {}
+        
+        async def push_update():
+            await asyncio.sleep(debounce_seconds)
+            if name_lookups:
+                try:
+                    # Shielded so a newer insert cancelling this push doesn't cancel the lookups too
+                    await asyncio.shield(asyncio.gather(*name_lookups.values(), return_exceptions=True))
+                finally:
+                    # Drop finished lookups either way, so none can block later pushes
+                    for contact_id, lookup in list(name_lookups.items()):
+                        if lookup.done():
+                            del name_lookups[contact_id]
+            conversation_context = self.format_conversation_context([])
+            await self.update_heygen_knowledge_base(conversation_context)
+            self._save_context_state()
+        
+        def on_insert(payload: Dict[str, Any]):
+            nonlocal pending_update
+            record = payload.get('data', {}).get('record')
+            if not record:
+                return
+            self.add_messages([record])
+            
+            contact_id = str(record.get('contact_id', 'unknown'))
+            if self.contact_messages[contact_id]['name'] == "Unknown" and contact_id not in name_lookups:
+                name_lookups[contact_id] = asyncio.create_task(self.refresh_contact_name(contact_id))
+            
+            # Debounce bursts of messages into a single knowledge base update
+            if pending_update and not pending_update.done():
+                pending_update.cancel()
+            pending_update = asyncio.create_task(push_update())
+        
+        supabase = await acreate_client(self.supabase_url, self.supabase_service_key)
+        channel = supabase.channel("messages")
+        await channel.on_postgres_changes(
+            "INSERT", schema="public", table="messages", callback=on_insert
+        ).subscribe()
+        logger.info("Watching Supabase for new messages...")
+        
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await supabase.remove_channel(channel)
+
 # Configuration - loaded from .env file
 HEYGEN_API_KEY = os.getenv("HEYGEN_API_KEY")
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
 
-async def main():
-    """Test the knowledge updater"""
+async def main(watch: bool = False):
+    """Test the knowledge updater, or keep it running with --watch"""
     async with HeyGenKnowledgeUpdater(
         heygen_api_key=HEYGEN_API_KEY,
         supabase_url=SUPABASE_URL,
         supabase_service_key=SUPABASE_SERVICE_KEY
     ) as updater:
+        if watch:
+            await updater.watch_conversation_history()
+            return True
         success = await updater.update_knowledge_with_conversation_history()
         return success
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    asyncio.run(main(watch="--watch" in sys.argv)) 
\ No newline at end of file
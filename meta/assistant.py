@@ -1,7 +1,8 @@
 import openai
-import json
+import httpx
 import dotenv
 import os
+from functools import lru_cache
 from profile_manager import profile_manager
 
 dotenv.load_dotenv()
@@ -10,28 +11,58 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     raise ValueError("Error: OPENAI_API_KEY not found in environment variables")
 
-# Set API key properly using the new config system
-client = openai.OpenAI(api_key=OPENAI_API_KEY)
+# One persistent HTTP/2 pool per client so every turn reuses the same TLS session
+OPENAI_LIMITS = httpx.Limits(max_keepalive_connections=10, max_connections=20)
 
-def build_prompt(transcript):
+# Clients are built on first use so the CLI and the API server each only open the pool they need
+@lru_cache(maxsize=1)
+def get_client():
+    return openai.OpenAI(
+        api_key=OPENAI_API_KEY,
+        http_client=openai.DefaultHttpxClient(http2=True, limits=OPENAI_LIMITS)
+    )
+
+@lru_cache(maxsize=1)
+def get_async_client():
+    # Async twin for the API server so LLM calls don't tie up a worker thread
+    return openai.AsyncOpenAI(
+        api_key=OPENAI_API_KEY,
+        http_client=openai.DefaultAsyncHttpxClient(http2=True, limits=OPENAI_LIMITS)
+    )
+
+FALLBACK_REPLY = "That's interesting! Tell me more about that."
+
+SYSTEM_PROMPT = "You are a helpful AI assistant that provides natural, engaging responses for real-time conversations. Be authentic, charming, and conversational."
+
+# Cap on interests / traits listed in the prompt so growing profiles don't inflate every request
+MAX_PROMPT_ITEMS = 15
+
+def compact(items, limit):
+    """Most recent `limit` distinct, non-blank entries of a profile list, oldest first.
+    Profile lists grow by appending, so the newest entries are at the end."""
+    recent = dict.fromkeys(item.strip() for item in reversed(items) if isinstance(item, str) and item.strip())
+    return list(recent)[:limit][::-1]
+
+@lru_cache(maxsize=8)
+def build_system_prompt(profile_version):
+    """Build the static per-profile prefix; cached per profile version so it stays byte-identical across turns"""
     # Always load Ava's profile
-    profile = profile_manager.load_profile('416')  # Ava's contact ID
+    profile = profile_manager.get_cached('416')  # Ava's contact ID
     
     if not profile:
-        return f"""
-You're an AI assistant helping me on a date. The person just said: "{transcript}"
+        return f"""{SYSTEM_PROMPT}
 
-What is a charming, flirty, or witty one-liner I can say in response?
-Keep it natural and conversational.
-"""
+You're an AI assistant helping me on a date.
+When I tell you what the person just said, give me a charming, flirty, or witty one-liner I can say in response.
+Keep it natural and conversational."""
     
     # Build comprehensive prompt using Ava's profile information
     name = profile.get('name', 'Ava')
-    interests = ', '.join(profile.get('interests', []))
+    interests = ', '.join(compact(profile.get('interests', []), MAX_PROMPT_ITEMS))
     personality = profile.get('personality', {})
-    traits = ', '.join(personality.get('traits', []))
-    facts = '\n- '.join(profile.get('facts_learned', [])[:5])  # Top 5 facts
-    last_topics = ', '.join(profile.get('last_topics', [])[:3])  # Recent topics
+    traits = ', '.join(compact(personality.get('traits', []), MAX_PROMPT_ITEMS))
+    facts = '\n- '.join(compact(profile.get('facts_learned', []), 5))  # Latest 5 facts
+    last_topics = ', '.join(compact(profile.get('last_topics', []), 3))  # Latest 3 topics
     
     # Get unresolved topics for follow-up
     unresolved = profile.get('unresolved_topics', [])
@@ -40,7 +71,8 @@ Keep it natural and conversational.
         follow_ups.append(f"- {topic['question']}")
     follow_up_text = '\n'.join(follow_ups) if follow_ups else "No specific follow-ups needed."
     
-    return f"""
+    return f"""{SYSTEM_PROMPT}
+
 You're an AI assistant helping me on a date with {name}.
 
 PERSONALITY & INTERESTS:
@@ -57,8 +89,6 @@ RECENT CONVERSATION TOPICS:
 FOLLOW-UP OPPORTUNITIES:
 {follow_up_text}
 
-They just said: "{transcript}"
-
 INSTRUCTIONS:
 - Respond naturally and conversationally
 - Be charming, witty, and engaging
@@ -66,45 +96,110 @@ INSTRUCTIONS:
 - Ask follow-up questions to learn more about them
 - Keep the response concise (1-2 sentences)
 - Match their energy and communication style
-- Be authentic and avoid being overly scripted
+- Be authentic and avoid being overly scripted"""
+
+@lru_cache(maxsize=128)
+def build_prompt(transcript):
+    """Build the short per-turn message; everything static lives in the system prompt"""
+    return f"""They just said: "{transcript}"
 
 Response:"""
 
-def get_reply(transcript):
-    """Get AI response using the current profile"""
-    prompt = build_prompt(transcript)
+def build_messages(transcript):
+    """Build the chat messages for one turn"""
+    # Pick up hand edits to the profile file first, so the prompt cache key below reflects them
+    profile_manager.get_cached('416')
+    return [
+        {"role": "system", "content": build_system_prompt(profile_manager.version)},
+        {"role": "user", "content": build_prompt(transcript)}
+    ]
+
+def log_turn(transcript, reply):
+    # Log the conversation to Ava's profile (always), written in the background
+    contact_id = '416'  # Always use Ava's contact ID
+    profile_manager.queue_conversation_log(contact_id, transcript, reply)
+
+def stream_reply(transcript):
+    """Stream the AI response for the current profile, yielding text deltas as they arrive"""
+    chunks = []
     
     try:
-        response = client.chat.completions.create(
+        response = get_client().chat.completions.create(
             model="gpt-4o",
-            messages=[
-                {
-                    "role": "system", 
-                    "content": "You are a helpful AI assistant that provides natural, engaging responses for real-time conversations. Be authentic, charming, and conversational."
-                },
-                {"role": "user", "content": prompt}
-            ],
+            messages=build_messages(transcript),
             temperature=0.8,
-            max_tokens=100
+            max_tokens=100,
+            stream=True
         )
         
-        reply = response.choices[0].message.content.strip()
+        for chunk in response:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                chunks.append(delta)
+                yield delta
         
-        # Log the conversation to Ava's profile (always)
-        profile = profile_manager.load_profile('416')
-        if profile:
-            contact_id = '416'  # Always use Ava's contact ID
-            profile_manager.add_conversation_log(contact_id, transcript, reply)
+    except Exception as e:
+        print(f"Error getting AI response: {e}")
+        if not chunks:
+            yield FALLBACK_REPLY
+        return
+    
+    log_turn(transcript, "".join(chunks).strip())
+
+async def astream_reply(transcript):
+    """Async version of stream_reply for callers running on an event loop"""
+    chunks = []
+    
+    try:
+        response = await get_async_client().chat.completions.create(
+            model="gpt-4o",
+            messages=build_messages(transcript),
+            temperature=0.8,
+            max_tokens=100,
+            stream=True
+        )
         
-        return reply
+        async for chunk in response:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                chunks.append(delta)
+                yield delta
         
     except Exception as e:
         print(f"Error getting AI response: {e}")
-        return "That's interesting! Tell me more about that."
+        if not chunks:
+            yield FALLBACK_REPLY
+        return
+    
+    log_turn(transcript, "".join(chunks).strip())
+
+def get_reply(transcript):
+    """Get AI response using the current profile"""
+    return "".join(stream_reply(transcript)).strip()
+
+def warm_up():
+    """Open the OpenAI connection pool and load Ava's profile ahead of the first turn"""
+    try:
+        get_client().models.retrieve("gpt-4o")
+    except Exception as e:
+        print(f"Warning: OpenAI warm-up failed: {e}")
+    profile_manager.get_cached('416')
+
+async def async_warm_up():
+    """Open the async OpenAI connection pool and load Ava's profile ahead of the first turn"""
+    try:
+        await get_async_client().models.retrieve("gpt-4o")
+    except Exception as e:
+        print(f"Warning: OpenAI warm-up failed: {e}")
+    profile_manager.get_cached('416')
 
 def get_current_profile_info():
     """Get information about Ava's profile (always)"""
-    profile = profile_manager.load_profile('416')  # Always load Ava
+    profile = profile_manager.get_cached('416')  # Always load Ava
     if profile:
         return {
             'name': profile.get('name', 'Ava'),
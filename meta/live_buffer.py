@@ -1,28 +1,80 @@
 import numpy as np
 import sounddevice as sd
+import os
+import tempfile
 import threading
-import time
 import scipy.io.wavfile as wavfile
-from collections import deque
+
+try:
+    # Compiled ring writes keep the realtime audio thread out of the interpreter
+    from numba import njit
+except ImportError:
+    njit = None
 
 SAMPLE_RATE = 16000
 BUFFER_DURATION = 10
 CHUNK_SIZE = 1024
+# Buffers quieter than this RMS (about -45 dBFS) are treated as silence
+SILENCE_RMS = 0.005
+
+# Keep the scratch WAV in RAM (tmpfs) where available
+TEMP_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+TEMP_WAV = os.path.join(TEMP_DIR, "rizzbot_temp.wav")
+
+# 10-second ring buffer; the audio callback copies each block in place
+BUFFER_SIZE = int(SAMPLE_RATE * BUFFER_DURATION)
+ring = np.zeros(BUFFER_SIZE, dtype=np.float32)
+write_index = 0
+filled = 0
+buffer_lock = threading.Lock()
+# Set by stop_audio_stream to close the input stream
+stop_event = threading.Event()
+
+def copy_into_ring(ring, audio_chunk, start):
+    """Copy samples into the ring starting at `start`, wrapping at the end; returns the next write index"""
+    size = ring.shape[0]
+    end = start + audio_chunk.shape[0]
+    if end <= size:
+        ring[start:end] = audio_chunk
+    else:
+        split = size - start
+        ring[start:] = audio_chunk[:split]
+        ring[:end - size] = audio_chunk[split:]
+    return end % size
 
-# 10-second buffer
-buffer = deque(maxlen=int(SAMPLE_RATE * BUFFER_DURATION))
-stream_active = False
+if njit is not None:
+    # Compiled eagerly for the callback's float32 blocks so the first callback doesn't pay for JIT;
+    # nogil lets the copy run without holding the GIL, so reply generation can't stall the callback
+    copy_into_ring = njit("int64(float32[:], float32[:], int64)", cache=True, nogil=True)(copy_into_ring)
+
+def write_to_buffer(audio_chunk):
+    """Copy a block of samples into the ring buffer, wrapping at the end"""
+    global write_index, filled
+    if len(audio_chunk) > BUFFER_SIZE:
+        audio_chunk = audio_chunk[-BUFFER_SIZE:]
+    frames = len(audio_chunk)
+    
+    with buffer_lock:
+        write_index = copy_into_ring(ring, audio_chunk, write_index)
+        filled = min(filled + frames, BUFFER_SIZE)
+
+def get_buffer_audio():
+    """Return the buffered samples oldest-first as a new array"""
+    with buffer_lock:
+        if filled < BUFFER_SIZE:
+            return ring[:filled].copy()
+        return np.concatenate((ring[write_index:], ring[:write_index]))
 
 # Background stream that fills the buffer
 def audio_stream():
-    global stream_active
+    stop_event.clear()
     
     def callback(indata, frames, time, status):
         if status:
             print(f"Audio callback status: {status}")
         # Convert to mono and add to buffer
         audio_chunk = indata[:, 0] if indata.ndim > 1 else indata
-        buffer.extend(audio_chunk)
+        write_to_buffer(audio_chunk)
     
     try:
         with sd.InputStream(
@@ -32,29 +84,44 @@ def audio_stream():
             blocksize=CHUNK_SIZE,
             dtype=np.float32
         ) as stream:
-            stream_active = True
             print("Audio buffer started - listening...")
-            while stream_active:
-                time.sleep(0.1)
+            # Block until stopped; the stream runs its callback on its own thread meanwhile
+            stop_event.wait()
     except Exception as e:
         print(f"Audio stream error: {e}")
 
-# Save current buffer to WAV
-def save_buffer_to_wav(filename="temp.wav"):
-    global buffer
-    if len(buffer) == 0:
+# Grab the current buffer as float32 samples Whisper can take directly
+def snapshot_buffer():
+    audio_np = get_buffer_audio()
+    if len(audio_np) == 0:
         print("Buffer is empty - no audio captured")
-        return False
+        return None
     
-    # Convert buffer to numpy array
-    audio_np = np.array(list(buffer), dtype=np.float32)
+    # Skip near-silent buffers before normalization would amplify them,
+    # so callers don't pay for a Whisper pass over background noise
+    rms = float(np.sqrt(np.dot(audio_np, audio_np) / len(audio_np)))
+    if rms < SILENCE_RMS:
+        print(f"Buffer is near-silent (RMS {rms:.4f}) - skipping")
+        return None
     
-    # Normalize audio to prevent clipping
-    if np.max(np.abs(audio_np)) > 0:
-        audio_np = audio_np / np.max(np.abs(audio_np)) * 0.9
+    # Normalize to 90% of full scale in place
+    # (audio_np is a fresh copy of the ring, so scaling it in place is safe)
+    peak = float(np.abs(audio_np).max())
+    if peak > 0:
+        np.multiply(audio_np, 0.9 / peak, out=audio_np)
+    return audio_np
+
+# Save current buffer (or a snapshot already taken) to WAV, for debugging
+def save_buffer_to_wav(filename=TEMP_WAV, audio_np=None):
+    if audio_np is None:
+        audio_np = snapshot_buffer()
+        if audio_np is None:
+            return False
     
-    # Convert to int16 for WAV file
-    audio_int16 = (audio_np * 32767).astype(np.int16)
+    # Convert to int16 for WAV file, scaling straight into the output array
+    # (no float32 temporary, and the caller's samples are left untouched)
+    audio_int16 = np.empty(len(audio_np), dtype=np.int16)
+    np.multiply(audio_np, 32767, out=audio_int16, casting='unsafe')
     
     # Save to WAV file
     wavfile.write(filename, SAMPLE_RATE, audio_int16)
@@ -62,5 +129,4 @@ def save_buffer_to_wav(filename="temp.wav"):
     return True
 
 def stop_audio_stream():
-    global stream_active
-    stream_active = False
+    stop_event.set()
@@ -1,16 +1,24 @@
-from live_buffer import audio_stream, save_buffer_to_wav, stop_audio_stream
-from assistant import get_reply, get_current_profile_info
-from mic_to_text import transcribe_audio
-from speak import speak
+from live_buffer import audio_stream, snapshot_buffer, save_buffer_to_wav, stop_audio_stream, TEMP_WAV
+import os
+import queue
+import sys
 import threading
-import time
+from concurrent.futures import ThreadPoolExecutor
 
-# Start background mic buffer thread
+# Pass --save-wav (or set RIZZ_SAVE_WAV=1) to keep a copy of each captured clip for debugging
+SAVE_DEBUG_WAV = "--save-wav" in sys.argv or os.getenv("RIZZ_SAVE_WAV") == "1"
+
+# Start background mic buffer thread first so it is already filling
+# while the Whisper model, OpenAI client and TTS engine load below
 audio_thread = threading.Thread(target=audio_stream, daemon=True)
 audio_thread.start()
 
-# Give the audio stream time to initialize
-time.sleep(1)
+from assistant import get_reply, get_current_profile_info
+from mic_to_text import transcribe_audio, warm_up as warm_up_whisper
+from speak import speak
+
+# Load Whisper in the background so the first tap doesn't pay for it
+threading.Thread(target=warm_up_whisper, daemon=True).start()
 
 print("🎤 Always listening... Press Enter to trigger RizzBot.\n")
 
@@ -24,24 +32,47 @@ else:
     print("⚠️  No active profile found - using default settings")
 print()
 
+def respond(audio):
+    """Transcribe a captured clip and generate the reply"""
+    her_line = transcribe_audio(audio)
+    print(f"🎧 They said: {her_line}")
+
+    response = get_reply(her_line)
+    print(f"🤖 RizzBot says: {response}")
+    return response
+
+def speech_worker():
+    """Speak replies one at a time, in the order the clips were captured"""
+    while True:
+        future = speech_queue.get()
+        try:
+            speak(future.result())
+        except Exception as e:
+            print(f"❌ Error responding: {e}")
+
+# Transcription + reply run in the background so the next clip can be captured
+# while the previous reply is still being generated or spoken
+executor = ThreadPoolExecutor(max_workers=2)
+speech_queue = queue.Queue()
+threading.Thread(target=speech_worker, daemon=True).start()
+
 try:
     while True:
         input("Tap to respond to last 10 seconds...\n")
 
-        # Save last 10 seconds of mic input
-        if save_buffer_to_wav():
+        # Grab last 10 seconds of mic input
+        audio = snapshot_buffer()
+        if audio is not None:
+            if SAVE_DEBUG_WAV:
+                save_buffer_to_wav(TEMP_WAV, audio)
+            
             # Transcribe + respond
-            her_line = transcribe_audio()
-            print(f"🎧 They said: {her_line}")
-
-            response = get_reply(her_line)
-            print(f"🤖 RizzBot says: {response}")
-
-            speak(response)
+            speech_queue.put(executor.submit(respond, audio))
         else:
             print("❌ No audio captured - try speaking louder")
 
 except KeyboardInterrupt:
     print("\n🛑 Stopping audio buffer...")
+    executor.shutdown(wait=False, cancel_futures=True)
     stop_audio_stream()
     print("👋 Goodbye!")
@@ -1,9 +1,39 @@
 # mic_to_text.py
-import whisper
+import os
+import threading
+import ctranslate2
+import numpy as np
+from faster_whisper import WhisperModel
 
-model = whisper.load_model("base")
+SAMPLE_RATE = 16000
 
-def transcribe_audio(filename="temp.wav"):
-    result = model.transcribe(filename)
-    return result["text"]
+# Number of transcriptions the model can run at once from different threads
+NUM_WORKERS = int(os.getenv("WHISPER_WORKERS", "2"))
 
+# CTranslate2 backend: float16 on GPU hosts, int8 weights on CPU
+DEVICE = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+COMPUTE_TYPE = "float16" if DEVICE == "cuda" else "int8"
+
+# Loaded on first use, so processes that only import this module (e.g. the uvicorn
+# supervisor that spawns the API workers) never build a model they won't run
+model = None
+model_lock = threading.Lock()
+
+def get_model():
+    # The lock keeps a warm-up thread and the first request from both loading it
+    global model
+    with model_lock:
+        if model is None:
+            model = WhisperModel("base", device=DEVICE, compute_type=COMPUTE_TYPE, num_workers=NUM_WORKERS)
+    return model
+
+def transcribe_audio(audio):
+    # Accepts a path, a binary file object or 16 kHz float32 samples
+    # Forcing English skips the language-detection pass
+    segments, _ = get_model().transcribe(audio, language="en", beam_size=1, vad_filter=True)
+    return " ".join(segment.text.strip() for segment in segments)
+
+def warm_up():
+    # Decode one second of silence so the first real request doesn't pay for kernel setup
+    segments, _ = get_model().transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32), language="en", beam_size=1)
+    list(segments)
@@ -1,18 +1,68 @@
-import json
+import atexit
+import mmap
 import os
+import queue
+import threading
+import time
+from collections import deque
+import orjson
 import requests
+from datetime import datetime
 from typing import Dict, Any, Optional
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Seconds to wait for more conversation logs before rewriting the profile
+LOG_FLUSH_INTERVAL = 0.5
+# Queued at exit to tell the log writer to write what it holds and stop
+STOP_LOG_WRITER = object()
+# Contact IDs and the profile file each one maps to
+PROFILE_MAPPING = {
+    '647': 'bob.json',
+    '416': 'ava.json',
+    '289': 'adam.json'
+}
+# Conversation logs kept with a profile; older ones move to the archive
+MAX_CONVERSATION_LOGS = 50
+# Lines the log sidecar may grow to before it is trimmed back to MAX_CONVERSATION_LOGS
+MAX_SIDECAR_LOGS = MAX_CONVERSATION_LOGS * 10
+
+# Flush file data (not metadata) to disk; macOS only has fsync
+_datasync = getattr(os, 'fdatasync', os.fsync)
+
+def _sync_file(f):
+    """Push a file's buffered writes to disk before it is renamed or relied on"""
+    f.flush()
+    _datasync(f.fileno())
+
+def _dedup(items: list) -> list:
+    """Drop repeated entries while keeping first-seen order; lists of dicts are left as-is"""
+    try:
+        return list(dict.fromkeys(items))
+    except TypeError:
+        return items
+
 class ProfileManager:
     """Manages loading and updating knowledge graphs for different contacts"""
     
     def __init__(self, profiles_dir: str = "profiles"):
         self.profiles_dir = profiles_dir
         self.current_profile = None
+        # Bumped whenever a profile is written or re-read after changing on disk
+        self.version = 0
+        # Parsed profiles keyed by path, with the (mtime, size) they were read at
+        self._profile_cache: Dict[str, tuple] = {}
+        # Line count of each conversation-log sidecar, counted on first append
+        self._sidecar_lengths: Dict[str, int] = {}
+        
+        # Background conversation-log writer, started on first queued entry
+        self._log_queue = queue.Queue()
+        self._log_lock = threading.Lock()
+        # Only guards starting the writer; enqueueing never waits on a profile write
+        self._log_start_lock = threading.Lock()
+        self._log_thread = None
         
         # Get Supabase credentials from environment variables
         self.supabase_url = os.getenv("SUPABASE_URL")
@@ -34,8 +84,8 @@ class ProfileManager:
             # For now, we'll use a simple file-based approach
             settings_file = "current_starred.json"
             if os.path.exists(settings_file):
-                with open(settings_file, 'r') as f:
-                    data = json.load(f)
+                with open(settings_file, 'rb') as f:
+                    data = orjson.loads(f.read())
                     return data.get('starred_contact_id')
             return None
         except Exception as e:
@@ -45,32 +95,49 @@ class ProfileManager:
     def load_profile(self, contact_id: str) -> Optional[Dict[str, Any]]:
         """Load a specific contact's knowledge graph"""
         try:
-            # Map contact IDs to profile files
-            profile_mapping = {
-                '647': 'bob.json',
-                '416': 'ava.json', 
-                '289': 'adam.json'
-            }
-            
-            profile_file = profile_mapping.get(contact_id)
-            if not profile_file:
+            profile_path = self._profile_path(contact_id)
+            if not profile_path:
                 print(f"No profile mapping found for contact ID: {contact_id}")
                 return None
             
-            profile_path = os.path.join(self.profiles_dir, profile_file)
-            if not os.path.exists(profile_path):
+            try:
+                stat = os.stat(profile_path)
+            except FileNotFoundError:
                 print(f"Profile file not found: {profile_path}")
                 return None
             
-            with open(profile_path, 'r') as f:
-                profile = json.load(f)
-                self.current_profile = profile
-                return profile
+            # Reuse the parsed profile until the file changes on disk
+            file_version = (stat.st_mtime_ns, stat.st_size)
+            cached = self._profile_cache.get(profile_path)
+            if cached and cached[0] == file_version:
+                profile = cached[1]
+            else:
+                profile = self._read_profile(profile_path)
+                recent_logs = self._read_recent_logs(profile_path)
+                if recent_logs is not None:
+                    profile['conversation_logs'] = recent_logs
+                self._profile_cache[profile_path] = (file_version, profile)
+                # Hand edits to the file invalidate prompts built from the old copy
+                self.version += 1
+            
+            self.current_profile = profile
+            return profile
                 
         except Exception as e:
             print(f"Error loading profile: {e}")
             return None
     
+    @staticmethod
+    def _read_profile(profile_path: str) -> Dict[str, Any]:
+        """Parse a profile straight from a read-only mapping of the file, skipping the read() copy"""
+        with open(profile_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+    
+    def get_cached(self, contact_id: str) -> Optional[Dict[str, Any]]:
+        """Return the in-memory profile; costs one stat, and only re-parses if the file changed"""
+        return self.load_profile(contact_id)
+    
     def get_current_profile(self) -> Optional[Dict[str, Any]]:
         """Get the currently active profile (always Ava)"""
         if self.current_profile:
@@ -91,23 +158,15 @@ class ProfileManager:
                 if key in profile:
                     if isinstance(profile[key], list):
                         profile[key].extend(value if isinstance(value, list) else [value])
+                        profile[key] = _dedup(profile[key])
                     elif isinstance(profile[key], dict):
                         profile[key].update(value)
                     else:
                         profile[key] = value
             
             # Save the updated profile
-            profile_mapping = {
-                '647': 'bob.json',
-                '416': 'ava.json', 
-                '289': 'adam.json'
-            }
-            
-            profile_file = profile_mapping.get(contact_id)
-            if profile_file:
-                profile_path = os.path.join(self.profiles_dir, profile_file)
-                with open(profile_path, 'w') as f:
-                    json.dump(profile, f, indent=2)
+            if self._write_profile(contact_id, profile):
+                self.version += 1
                 
                 # Update current profile if it's the active one
                 if self.current_profile and self.current_profile.get('phone_number') == contact_id:
@@ -123,53 +182,169 @@ class ProfileManager:
     
     def add_conversation_log(self, contact_id: str, transcript: str, response: str, context: str = ""):
         """Add a conversation log entry to the profile"""
+        return self.add_conversation_logs(contact_id, [self._make_log_entry(transcript, response, context)])
+    
+    def queue_conversation_log(self, contact_id: str, transcript: str, response: str, context: str = ""):
+        """Queue a conversation log entry to be written in the background, off the reply path"""
+        if self._log_thread is None:
+            with self._log_start_lock:
+                if self._log_thread is None:
+                    self._log_thread = threading.Thread(target=self._log_writer_loop, daemon=True)
+                    self._log_thread.start()
+                    atexit.register(self._stop_log_writer)
+        self._log_queue.put((contact_id, self._make_log_entry(transcript, response, context)))
+    
+    def flush_conversation_logs(self):
+        """Write out every queued conversation log entry now"""
+        with self._log_lock:
+            pending = []
+            while True:
+                try:
+                    pending.append(self._log_queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write_queued_logs(pending)
+    
+    def _stop_log_writer(self):
+        """At exit, let the writer finish the entries it has already taken, then write any stragglers"""
+        self._log_queue.put(STOP_LOG_WRITER)
+        self._log_thread.join(timeout=10)
+        self.flush_conversation_logs()
+    
+    def _log_writer_loop(self):
+        """Drain the log queue, coalescing entries that arrive within one flush window"""
+        while True:
+            item = self._log_queue.get()
+            if item is not STOP_LOG_WRITER:
+                time.sleep(LOG_FLUSH_INTERVAL)
+            with self._log_lock:
+                pending = [item]
+                while True:
+                    try:
+                        pending.append(self._log_queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stopping = any(entry is STOP_LOG_WRITER for entry in pending)
+                self._write_queued_logs([entry for entry in pending if entry is not STOP_LOG_WRITER])
+            if stopping:
+                return
+    
+    def _write_queued_logs(self, pending):
+        """Group queued entries by contact so each profile is rewritten once"""
+        by_contact: Dict[str, list] = {}
+        for contact_id, entry in pending:
+            by_contact.setdefault(contact_id, []).append(entry)
+        for contact_id, entries in by_contact.items():
+            self.add_conversation_logs(contact_id, entries)
+    
+    @staticmethod
+    def _make_log_entry(transcript: str, response: str, context: str = "") -> Dict[str, Any]:
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "transcript": transcript,
+            "response": response,
+            "context": context
+        }
+    
+    def add_conversation_logs(self, contact_id: str, log_entries: list) -> bool:
+        """Append a batch of conversation log entries to the contact's log sidecar with a single write"""
         try:
-            from datetime import datetime
-            
-            log_entry = {
-                "timestamp": datetime.now().isoformat(),
-                "transcript": transcript,
-                "response": response,
-                "context": context
-            }
-            
             # Load current profile
             profile = self.load_profile(contact_id)
             if not profile:
                 return False
             
-            # Initialize conversation_logs if it doesn't exist
-            if 'conversation_logs' not in profile:
-                profile['conversation_logs'] = []
+            profile_path = self._profile_path(contact_id)
+            logs_path = self._logs_path(profile_path)
             
-            # Add the log entry
-            profile['conversation_logs'].append(log_entry)
+            # Logs live in an append-only JSONL file next to the profile so a turn
+            # costs one small write instead of rewriting the whole profile.
+            # The first time, carry over any logs still stored inline.
+            pending = log_entries
+            if profile_path not in self._sidecar_lengths:
+                if os.path.exists(logs_path):
+                    with open(logs_path, 'rb') as f:
+                        self._sidecar_lengths[profile_path] = sum(1 for _ in f)
+                else:
+                    pending = profile.get('conversation_logs', []) + log_entries
+                    self._sidecar_lengths[profile_path] = 0
             
-            # Keep only the last 50 entries
-            if len(profile['conversation_logs']) > 50:
-                profile['conversation_logs'] = profile['conversation_logs'][-50:]
+            # One sync per batch: the background writer coalesces a burst of turns into one call
+            with open(logs_path, 'ab') as f:
+                f.write(b"".join(orjson.dumps(entry) + b"\n" for entry in pending))
+                _sync_file(f)
+            self._sidecar_lengths[profile_path] += len(pending)
             
-            # Save the updated profile
-            profile_mapping = {
-                '647': 'bob.json',
-                '416': 'ava.json', 
-                '289': 'adam.json'
-            }
+            # Keep the in-memory profile showing the last MAX_CONVERSATION_LOGS entries
+            logs = profile.get('conversation_logs', []) + log_entries
+            profile['conversation_logs'] = logs[-MAX_CONVERSATION_LOGS:]
             
-            profile_file = profile_mapping.get(contact_id)
-            if profile_file:
-                profile_path = os.path.join(self.profiles_dir, profile_file)
-                with open(profile_path, 'w') as f:
-                    json.dump(profile, f, indent=2)
-                
-                return True
-            
-            return False
+            if self._sidecar_lengths[profile_path] > MAX_SIDECAR_LOGS:
+                self._trim_log_sidecar(profile_path)
+            return True
             
         except Exception as e:
             print(f"Error adding conversation log: {e}")
             return False
     
+    @staticmethod
+    def _logs_path(profile_path: str) -> str:
+        return f"{profile_path}.logs.jsonl"
+    
+    def _read_recent_logs(self, profile_path: str) -> Optional[list]:
+        """Last MAX_CONVERSATION_LOGS entries from the log sidecar, or None if there is none"""
+        try:
+            with open(self._logs_path(profile_path), 'rb') as f:
+                return [orjson.loads(line) for line in deque(f, maxlen=MAX_CONVERSATION_LOGS)]
+        except FileNotFoundError:
+            return None
+    
+    def _trim_log_sidecar(self, profile_path: str):
+        """Move all but the last MAX_CONVERSATION_LOGS sidecar entries to the archive"""
+        logs_path = self._logs_path(profile_path)
+        with open(logs_path, 'rb') as f:
+            lines = f.readlines()
+        with open(f"{profile_path}.archive.jsonl", 'ab') as f:
+            f.writelines(lines[:-MAX_CONVERSATION_LOGS])
+            _sync_file(f)
+        temp_path = f"{logs_path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.writelines(lines[-MAX_CONVERSATION_LOGS:])
+            _sync_file(f)
+        os.replace(temp_path, logs_path)
+        self._sidecar_lengths[profile_path] = min(len(lines), MAX_CONVERSATION_LOGS)
+    
+    def _profile_path(self, contact_id: str) -> Optional[str]:
+        """Path of a contact's profile file, or None if the contact has no profile"""
+        profile_file = PROFILE_MAPPING.get(contact_id)
+        if not profile_file:
+            return None
+        return os.path.join(self.profiles_dir, profile_file)
+    
+    def _write_profile(self, contact_id: str, profile: Dict[str, Any]) -> bool:
+        """Save a contact's profile; _save_profile makes it the cached copy"""
+        profile_path = self._profile_path(contact_id)
+        if not profile_path:
+            return False
+        self._save_profile(profile_path, profile)
+        return True
+    
+    def _save_profile(self, profile_path: str, profile: Dict[str, Any]):
+        """Write a profile to disk and refresh the parsed-profile cache"""
+        # Write to a temp file and swap it in so readers never see a half-written profile
+        temp_path = f"{profile_path}.tmp"
+        data = profile
+        if os.path.exists(self._logs_path(profile_path)):
+            # Conversation logs are kept in the sidecar, not in the profile file
+            data = {key: value for key, value in profile.items() if key != 'conversation_logs'}
+        with open(temp_path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            # Make the new contents durable first so a crash can't leave an empty profile behind the rename
+            _sync_file(f)
+        os.replace(temp_path, profile_path)
+        stat = os.stat(profile_path)
+        self._profile_cache[profile_path] = ((stat.st_mtime_ns, stat.st_size), profile)
+    
     def get_profile_summary(self, contact_id: str) -> str:
         """Get a summary of the profile for prompt building"""
         profile = self.load_profile(contact_id)
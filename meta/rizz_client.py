@@ -6,8 +6,28 @@ import threading
 import os
 from dotenv import load_dotenv
 
+try:
+    # Wake on filesystem events instead of polling when watchdog is installed
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+
 load_dotenv()
 
+RIZZ_FILE = "rizz_to_speak.txt"
+# Fallback poll interval when watchdog isn't available
+POLL_INTERVAL = 0.5
+
+class RizzFileHandler:
+    """watchdog handler that wakes the listen loop when the rizz file is written"""
+    
+    def __init__(self, wake_event):
+        self.wake_event = wake_event
+    
+    def dispatch(self, event):
+        if event.event_type in ("created", "modified") and os.path.basename(event.src_path) == RIZZ_FILE:
+            self.wake_event.set()
+
 class RizzClient:
     """Client that receives rizz text and speaks it through glasses"""
     
@@ -15,10 +35,19 @@ class RizzClient:
         self.api_url = api_url
         self.running = False
         self.check_thread = None
+        self.observer = None
+        # Set when the rizz file may have new text (or to stop the loop)
+        self.wake_event = threading.Event()
         
     def start_listening(self):
         """Start listening for rizz responses"""
         self.running = True
+        # Check once up front in case text was written before we started
+        self.wake_event.set()
+        if Observer is not None:
+            self.observer = Observer()
+            self.observer.schedule(RizzFileHandler(self.wake_event), os.path.dirname(os.path.abspath(RIZZ_FILE)))
+            self.observer.start()
         self.check_thread = threading.Thread(target=self._listen_loop, daemon=True)
         self.check_thread.start()
         print("🎧 RizzClient started - listening for responses...")
@@ -26,33 +55,43 @@ class RizzClient:
     def stop_listening(self):
         """Stop listening for rizz responses"""
         self.running = False
+        self.wake_event.set()
+        if self.observer:
+            self.observer.stop()
+            self.observer.join()
+            self.observer = None
         if self.check_thread:
             self.check_thread.join()
         print("🛑 RizzClient stopped")
         
     def _listen_loop(self):
-        """Main listening loop - checks for new rizz responses"""
+        """Main listening loop - speaks new rizz responses as they are written"""
+        # With watchdog we sleep until the file changes; otherwise poll like before
+        timeout = None if self.observer else POLL_INTERVAL
         while self.running:
+            self.wake_event.wait(timeout)
+            self.wake_event.clear()
+            if not self.running:
+                break
             try:
-                # Check if there's a new rizz response to speak
-                # For now, we'll use a simple file-based approach
-                rizz_file = "rizz_to_speak.txt"
+                # Claim the file before reading so sentences appended meanwhile
+                # land in a fresh file (and a fresh event) instead of being deleted
+                claimed_file = f"{RIZZ_FILE}.speaking"
+                try:
+                    os.replace(RIZZ_FILE, claimed_file)
+                except FileNotFoundError:
+                    continue
                 
-                if os.path.exists(rizz_file):
-                    with open(rizz_file, 'r') as f:
-                        rizz_text = f.read().strip()
-                    
-                    if rizz_text:
-                        print(f"🎤 Speaking: {rizz_text}")
-                        speak(rizz_text)
-                        
-                        # Clear the file after speaking
-                        os.remove(rizz_file)
+                with open(claimed_file, 'r') as f:
+                    rizz_text = f.read().strip()
+                os.remove(claimed_file)
+                
+                if rizz_text:
+                    print(f"🎤 Speaking: {rizz_text}")
+                    speak(rizz_text)
                         
             except Exception as e:
                 print(f"Error in rizz listening loop: {e}")
-                
-            time.sleep(0.5)  # Check every 500ms
     
     def speak_rizz(self, rizz_text):
         """Immediately speak the given rizz text"""
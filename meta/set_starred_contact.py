@@ -2,17 +2,27 @@
 """
 Simple script to set the starred contact for testing profile switching
 """
-import json
+import orjson
 import sys
 
+USAGE = """Usage:
+  python set_starred_contact.py <contact_id>  # Set starred contact
+  python set_starred_contact.py clear         # Clear starred contact
+  python set_starred_contact.py show          # Show current
+
+Available contacts:
+  647 - Bob
+  416 - Ava
+  289 - Adam"""
+
 def set_starred_contact(contact_id):
     """Set the starred contact ID"""
     data = {
         "starred_contact_id": contact_id
     }
     
-    with open("current_starred.json", "w") as f:
-        json.dump(data, f, indent=2)
+    with open("current_starred.json", "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
     
     print(f"✅ Set starred contact to: {contact_id}")
     
@@ -40,8 +50,8 @@ def clear_starred_contact():
 def show_current():
     """Show current starred contact"""
     try:
-        with open("current_starred.json", "r") as f:
-            data = json.load(f)
+        with open("current_starred.json", "rb") as f:
+            data = orjson.loads(f.read())
             contact_id = data.get("starred_contact_id")
             
             mapping = {
@@ -59,14 +69,7 @@ def show_current():
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage:")
-        print("  python set_starred_contact.py <contact_id>  # Set starred contact")
-        print("  python set_starred_contact.py clear         # Clear starred contact")
-        print("  python set_starred_contact.py show          # Show current")
-        print("\nAvailable contacts:")
-        print("  647 - Bob")
-        print("  416 - Ava")
-        print("  289 - Adam")
+        print(USAGE)
         sys.exit(1)
     
     command = sys.argv[1].lower()
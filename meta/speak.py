@@ -1,7 +1,38 @@
 import pyttsx3
+import queue
+import threading
+from concurrent.futures import Future
+
+# pyttsx3 drivers (SAPI5/COM, NSSpeech) are bound to the thread that created the engine,
+# so one worker thread owns it and speak() hands text over from any caller thread
+speech_requests = queue.Queue()
+
+def tts_worker():
+    """Create the engine on this thread and speak queued text in order"""
+    try:
+        # Driver start-up is slow, so create the engine once and reuse it
+        engine = pyttsx3.init()
+        engine.setProperty('rate', 250)
+    except Exception as e:
+        engine_error = e
+        engine = None
+
+    while True:
+        text, done = speech_requests.get()
+        if engine is None:
+            done.set_exception(engine_error)
+            continue
+        try:
+            engine.say(text)
+            engine.runAndWait()
+            done.set_result(None)
+        except Exception as e:
+            done.set_exception(e)
+
+threading.Thread(target=tts_worker, daemon=True).start()
 
 def speak(text):
-    engine = pyttsx3.init()
-    engine.setProperty('rate', 250)
-    engine.say(text)
-    engine.runAndWait()
\ No newline at end of file
+    """Speak text on the TTS worker, returning once it has been said"""
+    done = Future()
+    speech_requests.put((text, done))
+    done.result()
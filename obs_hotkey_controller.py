@@ -1,14 +1,17 @@
 #!/usr/bin/env python3
 """
 OBS Hotkey Controller with HeyGen Knowledge Base Integration
-Requires: pip install obsws-python keyboard httpx python-dotenv
+Requires: pip install obsws-python keyboard "httpx[http2]" python-dotenv
 """
 
 import asyncio
+import concurrent.futures
 import subprocess
 import sys
 import os
-from typing import Optional
+import signal
+import threading
+from typing import Dict, Optional, Tuple
 import logging
 
 try:
@@ -18,7 +21,7 @@ try:
     from dotenv import load_dotenv
 except ImportError as e:
     print(f"Missing required package: {e}")
-    print("Install with: pip install obsws-python keyboard httpx python-dotenv")
+    print("Install with: pip install obsws-python keyboard 'httpx[http2]' python-dotenv")
     sys.exit(1)
 
 from heygen_knowledge_updater import HeyGenKnowledgeUpdater
@@ -38,15 +41,17 @@ STOP_HOTKEY = "f10"  # Change to your preferred key
 # Browser source name (change to match your OBS source name)
 BROWSER_SOURCE_NAME = "Browser"
 
-# Commands to run
-START_COMMAND = ["echo", "Starting recording..."]  # Replace with your command
-STOP_COMMAND = ["echo", "Recording stopped."]     # Replace with your command
+# Commands to run (None skips the step, so no process is spawned per press)
+START_COMMAND = None  # e.g. ["python", "start_overlay.py"]
+STOP_COMMAND = None   # e.g. ["python", "cleanup.py"]
+COMMANDS_BLOCKING = False  # Set True to wait for each command before continuing the sequence
 
 # HeyGen and Supabase Configuration (loaded from .env)
 HEYGEN_API_KEY = os.getenv("HEYGEN_API_KEY")
 SUPABASE_URL = os.getenv("SUPABASE_URL") 
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 KNOWLEDGE_BASE_ID = "7539c5f570384a9c819eac8b19503b34"  # Your HeyGen knowledge base ID
+HEYGEN_UPDATE_TIMEOUT = 60  # Seconds to wait for a knowledge base update
 
 # Logging setup
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -56,22 +61,101 @@ class OBSController:
     def __init__(self):
         self.client: Optional[obs.ReqClient] = None
         self.is_recording = False
+        self.updater: Optional[HeyGenKnowledgeUpdater] = None
+        self.heygen_update: Optional[concurrent.futures.Future] = None
+        # Scene item IDs keyed by (scene name, source name), and the scene recording started in
+        self.source_ids: Dict[Tuple[str, str], int] = {}
+        self.recording_scene: Optional[str] = None
+        # Start/stop sequences run one at a time, in press order, off the keyboard hook thread;
+        # a press that lands mid-sequence waits its turn instead of being dropped
+        self.sequences = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="obs-sequence")
+        # START/STOP_COMMAND processes that may still be running
+        self.command_procs = []
+        
+        # One long-lived event loop for HeyGen/Supabase calls, so the updater's
+        # HTTP client (and its TLS connections) survive between hotkey presses
+        self.loop = asyncio.new_event_loop()
+        self.loop_thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.loop_thread.start()
         
     def connect(self):
         """Connect to OBS WebSocket"""
+        # Check if credentials are configured
+        opening = None
+        if HEYGEN_API_KEY and SUPABASE_URL and SUPABASE_SERVICE_KEY:
+            # Open the HeyGen/Supabase connections on the controller's loop while OBS connects here
+            opening = asyncio.run_coroutine_threadsafe(self._open_updater(), self.loop)
+        else:
+            logger.warning("HeyGen/Supabase credentials not found in .env file - knowledge base updates disabled")
+            logger.info("Make sure HEYGEN_API_KEY, SUPABASE_URL, and SUPABASE_SERVICE_KEY are set in your .env file")
+        
+        connected = self._connect_obs()
+        
+        if opening:
+            try:
+                self.updater = opening.result(HEYGEN_UPDATE_TIMEOUT)
+            except Exception as e:
+                opening.cancel()
+                logger.error("Failed to set up HeyGen knowledge updater: %s", e)
+        return connected
+    
+    def _connect_obs(self) -> bool:
         try:
             self.client = obs.ReqClient(host=OBS_HOST, port=OBS_PORT, password=OBS_PASSWORD)
             logger.info("Connected to OBS WebSocket")
-            return True
         except Exception as e:
-            logger.error(f"Failed to connect to OBS: {e}")
+            logger.error("Failed to connect to OBS: %s", e)
             return False
+        
+        # Look up the browser source's scene item now so the first hotkey press doesn't have to
+        self.get_source_id(BROWSER_SOURCE_NAME)
+        return True
     
     def disconnect(self):
         """Disconnect from OBS"""
-        if self.client:
-            self.client.disconnect()
-            logger.info("Disconnected from OBS")
+        try:
+            # Let queued presses (e.g. a final F10) run before tearing anything down
+            self.sequences.shutdown(wait=True)
+            for proc in list(self.command_procs):
+                try:
+                    proc.wait(timeout=HEYGEN_UPDATE_TIMEOUT)
+                except subprocess.TimeoutExpired:
+                    logger.warning("Command %s still running at shutdown", proc.args)
+            if self.heygen_update:
+                # Let an in-flight knowledge base update finish before closing its client
+                concurrent.futures.wait([self.heygen_update], timeout=HEYGEN_UPDATE_TIMEOUT)
+            if self.updater:
+                self._run_async(self.updater.__aexit__(None, None, None))
+                self.updater = None
+        finally:
+            # Always stop the loop and close the OBS socket, even if the cleanup above failed
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.loop_thread.join(timeout=2)
+            if self.client:
+                self.client.disconnect()
+                self.client = None
+                logger.info("Disconnected from OBS")
+    
+    def _run_async(self, coro, timeout: float = HEYGEN_UPDATE_TIMEOUT):
+        """Run a coroutine on the controller's event loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+    
+    async def _open_updater(self) -> HeyGenKnowledgeUpdater:
+        """Create the knowledge updater once, on the controller's loop, and open its connections"""
+        updater = HeyGenKnowledgeUpdater(
+            heygen_api_key=HEYGEN_API_KEY,
+            supabase_url=SUPABASE_URL,
+            supabase_service_key=SUPABASE_SERVICE_KEY,
+            knowledge_base_id=KNOWLEDGE_BASE_ID
+        )
+        await updater.__aenter__()
+        await updater.warm_up()
+        return updater
+    
+    def trigger(self, sequence):
+        """Queue a start/stop sequence on the sequence worker so the keyboard hook thread never blocks"""
+        # Duplicate presses are rejected by the sequences themselves via is_recording
+        self.sequences.submit(sequence)
     
     def start_recording_sequence(self):
         """Execute start recording sequence"""
@@ -81,24 +165,20 @@ class OBSController:
         
         try:
             # 1. Run start command
-            logger.info("Running start command...")
-            subprocess.run(START_COMMAND, check=True)
+            if START_COMMAND:
+                logger.info("Running start command...")
+                self.run_command(START_COMMAND)
             
-            # 2. Update HeyGen knowledge base with conversation history
-            logger.info("Updating HeyGen knowledge base with conversation history...")
-            asyncio.run(self._update_heygen_knowledge())
+            # 2. Update HeyGen knowledge base with conversation history in the background;
+            # recording doesn't depend on it, so don't wait for Supabase/HeyGen here
+            self._schedule_heygen_update()
             
             # 3. Make browser source visible
-            logger.info(f"Making '{BROWSER_SOURCE_NAME}' visible...")
-            # Get current scene name
+            logger.info("Making '%s' visible...", BROWSER_SOURCE_NAME)
+            # Remember the scene so the stop sequence can hide the source without asking OBS again
             current_scene = self.client.get_current_program_scene()
-            scene_name = current_scene.current_program_scene_name
-            
-            self.client.set_scene_item_enabled(
-                scene_name,
-                self.get_source_id(BROWSER_SOURCE_NAME),
-                True
-            )
+            self.recording_scene = current_scene.current_program_scene_name
+            self.set_source_enabled(self.recording_scene, BROWSER_SOURCE_NAME, True)
             
             # 4. Start recording
             logger.info("Starting OBS recording...")
@@ -108,7 +188,7 @@ class OBSController:
             logger.info("✅ Recording sequence started!")
             
         except Exception as e:
-            logger.error(f"Error in start sequence: {e}")
+            logger.error("Error in start sequence: %s", e)
     
     def stop_recording_sequence(self):
         """Execute stop recording sequence"""
@@ -122,72 +202,103 @@ class OBSController:
             self.client.stop_record()
             
             # 2. Make browser source invisible
-            logger.info(f"Making '{BROWSER_SOURCE_NAME}' invisible...")
-            # Get current scene name
-            current_scene = self.client.get_current_program_scene()
-            scene_name = current_scene.current_program_scene_name
-            
-            self.client.set_scene_item_enabled(
-                scene_name,
-                self.get_source_id(BROWSER_SOURCE_NAME),
-                False
-            )
+            logger.info("Making '%s' invisible...", BROWSER_SOURCE_NAME)
+            scene_name = self.recording_scene
+            if not scene_name:
+                current_scene = self.client.get_current_program_scene()
+                scene_name = current_scene.current_program_scene_name
+            self.set_source_enabled(scene_name, BROWSER_SOURCE_NAME, False)
             
             # 3. Run stop command
-            logger.info("Running stop command...")
-            subprocess.run(STOP_COMMAND, check=True)
+            if STOP_COMMAND:
+                logger.info("Running stop command...")
+                self.run_command(STOP_COMMAND)
             
             self.is_recording = False
             logger.info("✅ Recording sequence stopped!")
             
         except Exception as e:
-            logger.error(f"Error in stop sequence: {e}")
+            logger.error("Error in stop sequence: %s", e)
+    
+    def run_command(self, command):
+        """Launch a configured command without waiting for it to exit"""
+        if COMMANDS_BLOCKING:
+            subprocess.run(command, check=True)
+            return
+        proc = subprocess.Popen(command)
+        self.command_procs.append(proc)
+        threading.Thread(target=self._report_command_exit, args=(proc,), daemon=True).start()
+    
+    def _report_command_exit(self, proc: subprocess.Popen):
+        returncode = proc.wait()
+        self.command_procs.remove(proc)
+        if returncode != 0:
+            logger.error("Command %s exited with status %s", proc.args, returncode)
+    
+    def _schedule_heygen_update(self):
+        """Start a knowledge base update on the controller's loop without waiting for it"""
+        if self.heygen_update and not self.heygen_update.done():
+            logger.info("HeyGen knowledge base update already in progress")
+            return
+        logger.info("Updating HeyGen knowledge base with conversation history...")
+        self.heygen_update = asyncio.run_coroutine_threadsafe(self._update_heygen_knowledge(), self.loop)
+        self.heygen_update.add_done_callback(self._log_heygen_update_error)
+    
+    @staticmethod
+    def _log_heygen_update_error(future: concurrent.futures.Future):
+        if not future.cancelled() and future.exception():
+            logger.error("Error updating HeyGen knowledge base: %s", future.exception())
     
     async def _update_heygen_knowledge(self):
         """Update HeyGen knowledge base with conversation context"""
         try:
-            # Check if credentials are configured
-            if (not HEYGEN_API_KEY or 
-                not SUPABASE_URL or 
-                not SUPABASE_SERVICE_KEY):
-                logger.warning("HeyGen/Supabase credentials not found in .env file - skipping knowledge base update")
-                logger.info("Make sure HEYGEN_API_KEY, SUPABASE_URL, and SUPABASE_SERVICE_KEY are set in your .env file")
+            if not self.updater:
+                logger.warning("HeyGen/Supabase credentials not configured - skipping knowledge base update")
                 return
             
-            # Create knowledge updater and update the knowledge base
-            async with HeyGenKnowledgeUpdater(
-                heygen_api_key=HEYGEN_API_KEY,
-                supabase_url=SUPABASE_URL,
-                supabase_service_key=SUPABASE_SERVICE_KEY,
-                knowledge_base_id=KNOWLEDGE_BASE_ID
-            ) as updater:
-                success = await updater.update_knowledge_with_conversation_history()
-                
-                if success:
-                    logger.info("✅ HeyGen knowledge base updated successfully")
-                else:
-                    logger.warning("⚠️ Failed to update HeyGen knowledge base")
+            success = await self.updater.update_knowledge_with_conversation_history()
+            
+            if success:
+                logger.info("✅ HeyGen knowledge base updated successfully")
+            else:
+                logger.warning("⚠️ Failed to update HeyGen knowledge base")
                     
         except Exception as e:
-            logger.error(f"Error updating HeyGen knowledge base: {e}")
+            logger.error("Error updating HeyGen knowledge base: %s", e)
     
-    def get_source_id(self, source_name: str) -> int:
-        """Get the scene item ID for a source"""
+    def set_source_enabled(self, scene_name: str, source_name: str, enabled: bool):
+        """Show or hide a source, refreshing its cached scene item ID once if OBS rejects it"""
         try:
-            # Get current scene
-            current_scene = self.client.get_current_program_scene()
-            scene_name = current_scene.current_program_scene_name
+            self.client.set_scene_item_enabled(scene_name, self.get_source_id(source_name, scene_name), enabled)
+        except Exception:
+            # The scene may have been edited since the ID was cached
+            if self.source_ids.pop((scene_name, source_name), None) is None:
+                raise
+            self.client.set_scene_item_enabled(scene_name, self.get_source_id(source_name, scene_name), enabled)
+    
+    def get_source_id(self, source_name: str, scene_name: Optional[str] = None) -> int:
+        """Get the scene item ID for a source, cached per scene"""
+        try:
+            if scene_name is None:
+                # Get current scene
+                current_scene = self.client.get_current_program_scene()
+                scene_name = current_scene.current_program_scene_name
+            
+            cached = self.source_ids.get((scene_name, source_name))
+            if cached is not None:
+                return cached
             
             # Get scene items
             scene_items = self.client.get_scene_item_list(scene_name)
             
             for item in scene_items.scene_items:
                 if item['sourceName'] == source_name:
+                    self.source_ids[(scene_name, source_name)] = item['sceneItemId']
                     return item['sceneItemId']
             
             raise ValueError(f"Source '{source_name}' not found in current scene")
         except Exception as e:
-            logger.error(f"Error getting source ID: {e}")
+            logger.error("Error getting source ID: %s", e)
             return 1  # Fallback
 
 def main():
@@ -195,6 +306,7 @@ def main():
     
     # Connect to OBS
     if not controller.connect():
+        controller.disconnect()
         print("Failed to connect to OBS. Make sure:")
         print("1. OBS Studio is running")
         print("2. WebSocket server is enabled (Tools > WebSocket Server Settings)")
@@ -207,18 +319,25 @@ def main():
     print("❌ Press ESC to quit")
     print("\nListening for hotkeys...")
     
+    # Set by ESC or Ctrl-C; Ctrl-C only sets the flag so shutdown always takes the same path
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    
     try:
-        # Register hotkey handlers
-        keyboard.add_hotkey(START_HOTKEY, controller.start_recording_sequence)
-        keyboard.add_hotkey(STOP_HOTKEY, controller.stop_recording_sequence)
+        # Register hotkey handlers; each sequence runs off the keyboard hook thread
+        keyboard.add_hotkey(START_HOTKEY, controller.trigger, args=(controller.start_recording_sequence,), trigger_on_release=False)
+        keyboard.add_hotkey(STOP_HOTKEY, controller.trigger, args=(controller.stop_recording_sequence,), trigger_on_release=False)
         
-        # Keep the script running
-        keyboard.wait('esc')
+        # Keep the script running until ESC; the timeout lets the SIGINT handler run
+        keyboard.add_hotkey('esc', stop_event.set)
+        while not stop_event.wait(timeout=0.5):
+            pass
         
-    except KeyboardInterrupt:
-        pass
     finally:
+        # Shutdown can wait on commands and HeyGen, so let a second Ctrl-C interrupt it
+        signal.signal(signal.SIGINT, signal.default_int_handler)
         print("\n🛑 Shutting down...")
+        keyboard.unhook_all()
         controller.disconnect()
 
 if __name__ == "__main__":
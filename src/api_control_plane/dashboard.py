@@ -15,6 +15,9 @@ logger = get_logger(__name__)
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
+# Message columns read by the conversation summary
+MESSAGE_SUMMARY_COLUMNS = "id, text_content, is_inbound, timestamp, sentiment"
+
 
 class ContactResponse(BaseModel):
     id: int
@@ -234,15 +237,15 @@ async def get_contacts():
     
     async with db_manager as db:
         try:
-            # Get all contacts
-            contacts_result = db.supabase.table('contacts').select('*').order('last_inbound_message_at', desc=True).execute()
+            # Get all contacts with their message counts embedded, in one round-trip
+            # instead of a separate messages query per contact
+            contacts_result = db.supabase.table('contacts').select('*, messages(count)').order('last_inbound_message_at', desc=True).execute()
             contacts = contacts_result.data if contacts_result.data else []
             
             contacts_data = []
             for contact in contacts:
-                # Get message count for this contact
-                messages_result = db.supabase.table('messages').select('id').eq('contact_id', contact['id']).execute()
-                message_count = len(messages_result.data) if messages_result.data else 0
+                message_counts = contact.get('messages') or []
+                message_count = message_counts[0]['count'] if message_counts else 0
                 
                 contacts_data.append(ContactResponse(
                     id=contact['id'],
@@ -297,26 +300,37 @@ async def get_conversation(contact_id: int):
     
     async with db_manager as db:
         try:
-            # Get contact
-            contact_result = db.supabase.table('contacts').select('*').eq('id', contact_id).execute()
+            # Get contact with its messages embedded, in one round-trip (only the message
+            # columns the summary uses, so the JSONB intents/entities/webhook payloads aren't pulled)
+            contact_result = db.supabase.table('contacts').select(f'*, messages({MESSAGE_SUMMARY_COLUMNS})').eq('id', contact_id).execute()
             contact = contact_result.data[0] if contact_result.data else None
                 
             if not contact:
                 raise HTTPException(status_code=404, detail="Contact not found")
             
             # Get message count
-            messages_result = db.supabase.table('messages').select('*').eq('contact_id', contact_id).execute()
-            messages = messages_result.data if messages_result.data else []
+            messages = contact.pop('messages', None) or []
             message_count = len(messages)
             
             # Get recent messages (last 20)
             recent_messages = sorted(messages, key=lambda x: x['timestamp'], reverse=True)[:20]
             recent_messages.reverse()  # Put back in chronological order
             
-            # Create simple conversation summary
-            inbound_count = sum(1 for msg in messages if msg.get('is_inbound'))
-            outbound_count = len(messages) - inbound_count
+            # Tally direction and inbound sentiment in one pass over the messages
+            inbound_count = 0
+            sentiment_count = 0
+            positive_count = 0
+            for msg in messages:
+                if msg.get('is_inbound'):
+                    inbound_count += 1
+                    sentiment = msg.get('sentiment')
+                    if sentiment:
+                        sentiment_count += 1
+                        if sentiment in ('positive', 'excited', 'warm'):
+                            positive_count += 1
+            outbound_count = message_count - inbound_count
             
+            # Create simple conversation summary
             summary = f"This conversation has {message_count} total messages ({inbound_count} received, {outbound_count} sent). "
             
             if recent_messages:
@@ -325,10 +339,8 @@ async def get_conversation(contact_id: int):
                 summary += f"Last activity: {last_timestamp.strftime('%Y-%m-%d %H:%M')}. "
                 
                 # Analyze sentiment
-                sentiments = [msg.get('sentiment') for msg in messages if msg.get('sentiment') and msg.get('is_inbound')]
-                if sentiments:
-                    positive_count = sum(1 for s in sentiments if s in ['positive', 'excited', 'warm'])
-                    if positive_count > len(sentiments) / 2:
+                if sentiment_count:
+                    if positive_count > sentiment_count / 2:
                         summary += "Overall tone appears positive and engaged."
                     else:
                         summary += "Mixed conversational tone."
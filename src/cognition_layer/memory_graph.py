@@ -61,11 +61,14 @@ class MemoryGraph:
                 "version": fact['version']
             })
         
+        # One fetch of recent messages serves both scans below
+        recent_messages = await self.db_manager.get_recent_messages(contact_id, limit=100)
+        
         # Get unresolved questions or topics
-        unresolved = await self._get_unresolved_topics(contact_id)
+        unresolved = self._get_unresolved_topics(recent_messages[-50:])
         
         # Get personality traits
-        personality_traits = await self._extract_personality_traits(contact_id)
+        personality_traits = self._extract_personality_traits(recent_messages)
         
         synopsis = {
             "contact_id": contact_id,
@@ -112,11 +115,8 @@ class MemoryGraph:
         else:
             return "other"
     
-    async def _get_unresolved_topics(self, contact_id: int) -> List[Dict[str, Any]]:
+    def _get_unresolved_topics(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Extract unresolved questions or topics from recent conversations"""
-        # Get recent messages
-        messages = await self.db_manager.get_recent_messages(contact_id, limit=50)
-        
         unresolved = []
         for i, message in enumerate(messages):
             if message.get('extracted_entities_json'):
@@ -134,11 +134,8 @@ class MemoryGraph:
         
         return unresolved[:5]  # Limit to 5 most recent
     
-    async def _extract_personality_traits(self, contact_id: int) -> List[str]:
+    def _extract_personality_traits(self, messages: List[Dict[str, Any]]) -> List[str]:
         """Extract personality traits based on conversation patterns"""
-        # Get recent messages with sentiment
-        messages = await self.db_manager.get_recent_messages(contact_id, limit=100)
-        
         traits = []
         sentiment_counts = {"positive": 0, "negative": 0, "excited": 0, "curious": 0}
         
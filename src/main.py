@@ -14,6 +14,7 @@ from src.core.message_queue import MessageQueue
 from src.perception_layer.message_processor import MessageProcessor
 from src.cognition_layer.orchestrator import CognitiveOrchestrator
 from src.utils.logging import get_logger
+from src.utils import embeddings
 from config.settings import settings
 
 logger = get_logger(__name__)
@@ -37,6 +38,10 @@ async def lifespan(app: FastAPI):
     # Register consumers
     await register_consumers(message_queue)
     
+    # Load the embedding model in the background so the first message doesn't pay for it
+    warm_up_task = asyncio.create_task(asyncio.to_thread(embeddings.warm_up))
+    running_tasks.append(warm_up_task)
+    
     # Start consumer tasks
     consumer_task = asyncio.create_task(message_queue.start_consumers())
     running_tasks.append(consumer_task)
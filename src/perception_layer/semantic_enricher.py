@@ -15,6 +15,40 @@ from src.perception_layer.models import (
 
 logger = get_logger(__name__)
 
+# Fields to extract. Everything static lives in the system message so it forms an
+# identical, cacheable prefix on every call; the message text and current date go in
+# the user message.
+EXTRACTION_INSTRUCTIONS = """1. **Intent:** What is the primary purpose of this message? Choose from: 'banter', 'logistics', 'scheduling', 'question', 'sharing_info', 'boundary', 'refusal', 'enthusiasm', 'acknowledgement', 'greeting', 'farewell'. You can list multiple if applicable.
+
+2. **Entities:** Identify any mentions of:
+   - person (names or references to people)
+   - location (places, venues, addresses)
+   - date (specific dates or day references)
+   - time (specific times or time ranges)
+   - food (dishes, restaurants, cuisine types)
+   - hobby (activities, interests, sports)
+   - job_title (professions, work roles)
+   - event (concerts, meetings, parties, etc.)
+   - object (physical items mentioned)
+   List them as key-value pairs.
+
+3. **Temporal Mentions:** Extract and normalize any explicit or implicit date/time references. Provide:
+   - original_text: the exact phrase from the message
+   - normalized_value: ISO 8601 format if possible (use the current date given with the message as reference)
+   - relative_reference: clear phrase like "tomorrow", "next Friday", etc.
+
+4. **Sentiment/Affect:** Describe the overall emotional tone. Choose from: 'positive', 'neutral', 'negative', 'excited', 'annoyed', 'curious', 'warm'.
+
+5. **Key Phrases/Topics:** Identify 1-3 most important phrases or topics discussed.
+
+6. **Questions Asked:** List any explicit questions posed in the message."""
+
+SINGLE_EXTRACTION_PROMPT = f"""You are a precise information extraction assistant analyzing a WhatsApp message. Always respond with valid JSON. Extract the following from the message:
+
+{EXTRACTION_INSTRUCTIONS}
+
+Provide the output in JSON format with keys: intents, entities, temporal_mentions, sentiment, key_phrases, questions."""
+
 
 class SemanticEnricher:
     """Extracts semantic information from messages using LLM"""
@@ -54,40 +88,13 @@ class SemanticEnricher:
     
     async def _extract_with_llm(self, message_text: str) -> Dict[str, Any]:
         """Use LLM to extract semantic information"""
-        prompt = f"""You are an intelligent assistant analyzing a WhatsApp message. Extract the following from the message:
-
-1. **Intent:** What is the primary purpose of this message? Choose from: 'banter', 'logistics', 'scheduling', 'question', 'sharing_info', 'boundary', 'refusal', 'enthusiasm', 'acknowledgement', 'greeting', 'farewell'. You can list multiple if applicable.
+        prompt = f"""Current date: {datetime.now().isoformat()}
 
-2. **Entities:** Identify any mentions of:
-   - person (names or references to people)
-   - location (places, venues, addresses)
-   - date (specific dates or day references)
-   - time (specific times or time ranges)
-   - food (dishes, restaurants, cuisine types)
-   - hobby (activities, interests, sports)
-   - job_title (professions, work roles)
-   - event (concerts, meetings, parties, etc.)
-   - object (physical items mentioned)
-   List them as key-value pairs.
-
-3. **Temporal Mentions:** Extract and normalize any explicit or implicit date/time references. Provide:
-   - original_text: the exact phrase from the message
-   - normalized_value: ISO 8601 format if possible (use current date as reference: {datetime.now().isoformat()})
-   - relative_reference: clear phrase like "tomorrow", "next Friday", etc.
-
-4. **Sentiment/Affect:** Describe the overall emotional tone. Choose from: 'positive', 'neutral', 'negative', 'excited', 'annoyed', 'curious', 'warm'.
-
-5. **Key Phrases/Topics:** Identify 1-3 most important phrases or topics discussed.
-
-6. **Questions Asked:** List any explicit questions posed in the message.
-
-Message: "{message_text}"
-
-Provide the output in JSON format with keys: intents, entities, temporal_mentions, sentiment, key_phrases, questions."""
+Message: {json.dumps(message_text, ensure_ascii=False)}"""
 
-        return await self._call_openai(prompt)
+        return await self._call_openai(SINGLE_EXTRACTION_PROMPT, prompt)
     
-    async def _call_openai(self, prompt: str) -> Dict[str, Any]:
+    async def _call_openai(self, system_prompt: str, prompt: str) -> Dict[str, Any]:
         """Call OpenAI API for extraction"""
         response = await self.httpx_client.post(
             "https://api.openai.com/v1/chat/completions",
@@ -98,7 +105,7 @@ Provide the output in JSON format with keys: intents, entities, temporal_mention
             json={
                 "model": "gpt-3.5-turbo",
                 "messages": [
-                    {"role": "system", "content": "You are a precise information extraction assistant. Always respond with valid JSON."},
+                    {"role": "system", "content": system_prompt},
                     {"role": "user", "content": prompt}
                 ],
                 "temperature": 0.1,
@@ -182,4 +189,4 @@ Provide the output in JSON format with keys: intents, entities, temporal_mention
             annotations = await self.enrich_message(message)
             results.append(annotations)
             
-        return results 
\ No newline at end of file
+        return results 
@@ -4,6 +4,7 @@ Supabase-based database manager for handling all persistence operations
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta
 import json
+from functools import lru_cache
 from cryptography.fernet import Fernet
 import numpy as np
 
@@ -16,15 +17,23 @@ from src.utils.embeddings import EmbeddingGenerator
 logger = get_logger(__name__)
 
 
+@lru_cache(maxsize=1)
+def get_supabase_client() -> Client:
+    """Create the Supabase client once per process; every SupabaseManager shares its connection pool"""
+    # Service role key for admin operations
+    return create_client(
+        settings.supabase_url,
+        settings.supabase_service_role_key.get_secret_value()
+    )
+
+
 class SupabaseManager:
     """Manages all database operations using Supabase client"""
     
     def __init__(self):
-        # Initialize Supabase client with service role key for admin operations
-        self.supabase: Client = create_client(
-            settings.supabase_url,
-            settings.supabase_service_role_key.get_secret_value()
-        )
+        # Reuse the shared Supabase client so each manager (one per dashboard request,
+        # one per pipeline component) doesn't open its own connection pool
+        self.supabase: Client = get_supabase_client()
         
         # Initialize encryption
         self.fernet = Fernet(settings.encryption_key.get_secret_value().encode())
@@ -396,8 +405,9 @@ class SupabaseManager:
             # Generate query embedding
             query_embedding = await self.embedding_generator.generate_embedding(query_text)
             
-            # Get all embeddings for this contact
-            result = self.supabase.table('message_embeddings').select('*, messages(*)').eq('messages.contact_id', contact_id).execute()
+            # Get all embeddings for this contact; the inner join filters rows server-side, so
+            # other contacts' vectors (and the unused embedding metadata) are never transferred
+            result = self.supabase.table('message_embeddings').select('embedding_vector, messages!inner(*)').eq('messages.contact_id', contact_id).execute()
             
             if not result.data:
                 return []
@@ -463,22 +473,26 @@ class SupabaseManager:
     ):
         """Update contact facts"""
         try:
-            # Insert new facts
-            for fact in new_facts:
-                fact_data = {
-                    'contact_id': contact_id,
-                    'user_id': 1,  # Default user ID
-                    'key': fact['key'],
-                    'value': fact['value'],
-                    'origin_message_id': origin_message_id,
-                    'extraction_confidence': fact.get('confidence', 1.0)
-                }
-                self.supabase.table('facts').insert(fact_data).execute()
-            
-            # Update reinforced facts
+            # Insert new facts in one bulk request rather than one round-trip per fact
+            if new_facts:
+                facts_data = [
+                    {
+                        'contact_id': contact_id,
+                        'user_id': 1,  # Default user ID
+                        'key': fact['key'],
+                        'value': fact['value'],
+                        'origin_message_id': origin_message_id,
+                        'extraction_confidence': fact.get('confidence', 1.0)
+                    }
+                    for fact in new_facts
+                ]
+                self.supabase.table('facts').insert(facts_data).execute()
+            
+            # Update reinforced facts (one timestamp for the whole batch)
+            reinforced_at = datetime.utcnow().isoformat()
             for fact in reinforced_facts:
                 self.supabase.table('facts').update({
-                    'last_reinforced': datetime.utcnow().isoformat(),
+                    'last_reinforced': reinforced_at,
                     'decay_weight': fact.get('decay_weight', 1.0),
                     'version': fact.get('version', 1) + 1
                 }).eq('id', fact['id']).execute()
@@ -5,6 +5,7 @@ import numpy as np
 import httpx
 from typing import List, Optional
 import hashlib
+from functools import lru_cache
 from sentence_transformers import SentenceTransformer
 
 from config.settings import settings
@@ -12,6 +13,25 @@ from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Local model used when no OpenAI key is configured, or as the fallback
+LOCAL_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+
+@lru_cache(maxsize=4)
+def load_local_model(model_name: str) -> SentenceTransformer:
+    """Load a sentence transformer once per process; every EmbeddingGenerator shares it"""
+    return SentenceTransformer(model_name)
+
+
+def warm_up():
+    """Load the local embedding model ahead of the first message when it is the one in use"""
+    if not settings.openai_api_key:
+        try:
+            load_local_model(LOCAL_EMBEDDING_MODEL)
+            logger.info(f"Warmed up local embedding model: {LOCAL_EMBEDDING_MODEL}")
+        except Exception as e:
+            logger.warning(f"Embedding model warm-up failed: {str(e)}")
+
 
 class EmbeddingGenerator:
     """Generate text embeddings using various models"""
@@ -33,18 +53,18 @@ class EmbeddingGenerator:
         if settings.openai_api_key:
             return "text-embedding-3-small"
         else:
-            return "all-MiniLM-L6-v2"  # Local sentence transformer
+            return LOCAL_EMBEDDING_MODEL  # Local sentence transformer
     
     def _initialize_local_model(self):
         """Initialize local sentence transformer model"""
         try:
-            self.local_model = SentenceTransformer(self.model_name)
+            self.local_model = load_local_model(self.model_name)
             logger.info(f"Initialized local embedding model: {self.model_name}")
         except Exception as e:
             logger.error(f"Failed to initialize local model: {str(e)}")
             # Fallback to a simpler model
-            self.model_name = "all-MiniLM-L6-v2"
-            self.local_model = SentenceTransformer(self.model_name)
+            self.model_name = LOCAL_EMBEDDING_MODEL
+            self.local_model = load_local_model(self.model_name)
     
     async def generate_embedding(self, text: str) -> np.ndarray:
         """Generate embedding for a single text"""
@@ -133,6 +133,10 @@ CREATE TABLE message_embeddings (
 CREATE INDEX idx_contact_user_whatsapp ON contacts(user_id, whatsapp_id);
 CREATE INDEX idx_message_contact_timestamp ON messages(contact_id, timestamp);
 CREATE INDEX idx_message_whatsapp_id ON messages(whatsapp_message_id);
+-- Newest-first reads across all contacts (latest / recent messages) become index range scans.
+-- On an existing database, create it without blocking writes:
+--   CREATE INDEX CONCURRENTLY idx_message_timestamp ON messages(timestamp DESC);
+CREATE INDEX idx_message_timestamp ON messages(timestamp DESC);
 CREATE INDEX idx_fact_contact_key ON facts(contact_id, key);
 CREATE INDEX idx_fact_last_reinforced ON facts(last_reinforced);
 CREATE INDEX idx_embedding_message ON message_embeddings(message_id);
@@ -189,6 +193,10 @@ CREATE POLICY "Users can view own messages" ON messages
 
 -- Apply similar policies to other tables...
 
+-- Supabase Realtime only streams tables in this publication;
+-- heygen_knowledge_updater.py --watch receives nothing without it
+ALTER PUBLICATION supabase_realtime ADD TABLE messages;
+
 -- Create a default user (REMOVE IN PRODUCTION)
 INSERT INTO users (email, hashed_password, whatsapp_phone_number_id, global_automation_enabled)
 VALUES ('default@example.com', 'placeholder_hash', '[YOUR-WHATSAPP-PHONE-NUMBER-ID]', true); 
\ No newline at end of file